@@ -1,74 +1,162 @@
 import streamlit as st
-import json
+import codecs
+import csv
+import html
+import io
 import re
-from urllib.parse import urlparse
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import os
-
-def extract_urls(obj):
-    """Recursively extract all URLs from a nested dictionary, list, or string."""
-    urls = []
-
-    if isinstance(obj, dict):
-        for value in obj.values():
-            urls.extend(extract_urls(value))
-    elif isinstance(obj, list):
-        for item in obj:
-            urls.extend(extract_urls(item))  # Fixed: changed 'url' to 'urls'
-    elif isinstance(obj, str):
-        urls.extend(re.findall(r'https?:\/\/[^\s"\'<>]+|\/\/[^\s"\'<>]+', obj))
-
-    return urls
-
-def normalize_url(url):
-    """Ensure the URL has a proper scheme."""
-    if url.startswith("//"):
-        return "https:" + url
-    return url
-
-def extract_domain(url):
-    """Extract domain from a URL."""
-    parsed = urlparse(url)
-    return parsed.netloc
-
-def safe_parse_json(raw_input):
-    """Try to parse raw input into JSON; fallback to None if fails."""
-    try:
-        return json.loads(raw_input)
-    except json.JSONDecodeError:
-        return None
+
+from url_extractor import dump_json, extract_domain, process_data
+
+_HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+_TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+_META_TAG_RE = re.compile(rb'<meta\b[^>]*>', re.IGNORECASE)
+_ATTR_RE = re.compile(rb'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+# Covers both <meta charset="..."> and the http-equiv Content-Type form
+_META_CHARSET_RE = re.compile(rb'<meta\b[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+# Title and meta description live in <head>; stop downloading after this many bytes
+HEAD_READ_LIMIT = 64 * 1024
+
+# Worker threads used when "Parallel processing" is enabled
+MAX_FETCH_WORKERS = 16
+
+# Upper bound on progress bar refreshes per fetch
+PROGRESS_UPDATES = 20
+
+# (connect, read) timeouts in seconds for every request
+REQUEST_TIMEOUT = (3, 7)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Keys of the dicts returned by get_url_info, in display order
+DETAILS_COLUMNS = ("url", "title", "meta_description", "status_code", "exists")
+
+# Streamlit re-executes this script on every rerun, so process-wide state has
+# to live in st.cache_resource rather than in plain module globals
+
+@st.cache_resource
+def _shared_thread_local():
+    """Thread-local storage for the per-thread sessions, created once per server."""
+    return threading.local()
+
+_thread_local = _shared_thread_local()
+
+def _get_session():
+    """Return this thread's requests.Session so connections get reused."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        # Keep idle connections to up to 32 hosts; a session is only used by its own thread
+        adapter = HTTPAdapter(pool_connections=32, max_retries=Retry(total=1))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _thread_local.session = session
+    return session
+
+def _read_head(response):
+    """Read a streamed response only up to its closing </head> tag."""
+    content = bytearray()
+    for chunk in response.iter_content(chunk_size=8192):
+        content += chunk
+        if len(content) >= HEAD_READ_LIMIT or _HEAD_END_RE.search(content):
+            break
+    return bytes(content)
+
+def _truncate(text, limit):
+    """Strip text and cut it to limit characters, marking the cut with '...'."""
+    text = text.strip()
+    return text[:limit] + "..." if len(text) > limit else text
+
+def _pick_encoding(content, declared):
+    """Pick a codec: the header charset, then the <meta> charset, then UTF-8."""
+    candidates = [declared]
+    match = _META_CHARSET_RE.search(content)
+    if match:
+        candidates.append(match.group(1).decode('ascii'))
+    for name in candidates:
+        if name:
+            try:
+                return codecs.lookup(name).name
+            except LookupError:
+                pass  # unknown charset name; try the next source
+    return 'utf-8'
+
+def _parse_head(content, declared_encoding=None):
+    """Return the (title, meta description) found in raw HTML bytes."""
+    title = description = og_description = None
+    encoding = _pick_encoding(content, declared_encoding)
+
+    match = _TITLE_RE.search(content)
+    if match:
+        title = html.unescape(match.group(1).decode(encoding, 'replace'))
+
+    for tag in _META_TAG_RE.findall(content):
+        attrs = {name.lower(): dq or sq or bare for name, dq, sq, bare in _ATTR_RE.findall(tag)}
+        value = attrs.get(b'content')
+        if not value:
+            continue
+        if attrs.get(b'name', b'').lower() == b'description':
+            description = value
+            break
+        if og_description is None and attrs.get(b'property', b'').lower() == b'og:description':
+            og_description = value
+    description = description or og_description
+    if description:
+        description = html.unescape(description.decode(encoding, 'replace'))
+
+    if title is None and description is None:
+        # Nothing matched; let the forgiving parser have a go at odd markup
+        soup = BeautifulSoup(content, 'html.parser')
+        title_tag = soup.find('title')
+        if title_tag:
+            title = title_tag.get_text()
+        meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
+        if not meta_desc_tag:
+            meta_desc_tag = soup.find('meta', attrs={'property': 'og:description'})
+        if meta_desc_tag:
+            description = meta_desc_tag.get('content')
+
+    return title, description
 
 def get_url_info(url):
     """Extract title, meta description, and check if URL exists."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, timeout=10, headers=headers, allow_redirects=True)
+        session = _get_session()
+        
+        # Check status with a body-less HEAD first
+        response = session.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
         
         title = "N/A"
         meta_description = "N/A"
         status = response.status_code
+        
+        # Only download pages we will read, plus servers that refuse or block HEAD
+        if status in (200, 403, 405, 501):
+            with session.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True, stream=True) as response:
+                status = response.status_code
+                if status == 200:
+                    content = _read_head(response)
+                    # requests assumes ISO-8859-1 when no charset is sent; only trust an explicit one
+                    has_charset = 'charset' in response.headers.get('Content-Type', '').lower()
+                    encoding = response.encoding if has_charset else None
+        
         exists = status != 404
         
         if status == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.get_text().strip()[:100] + "..." if len(title_tag.get_text().strip()) > 100 else title_tag.get_text().strip()
-            
-            # Extract meta description
-            meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-            if not meta_desc_tag:
-                meta_desc_tag = soup.find('meta', attrs={'property': 'og:description'})
-            
-            if meta_desc_tag and meta_desc_tag.get('content'):
-                meta_description = meta_desc_tag.get('content').strip()[:150] + "..." if len(meta_desc_tag.get('content').strip()) > 150 else meta_desc_tag.get('content').strip()
+            page_title, description = _parse_head(content, encoding)
+            if page_title:
+                title = _truncate(page_title, 100)
+            if description:
+                meta_description = _truncate(description, 150)
         
         return {
             "url": url,
@@ -86,129 +174,144 @@ def get_url_info(url):
             "exists": False
         }
 
-def generate_html_report(urls_data, filename):
-    """Generate a beautiful HTML report with URL information."""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>URL Extraction Report</title>
-        <style>
-            body {{
+# Stylesheet shared by every generated report
+_REPORT_STYLE = """
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 line-height: 1.6;
                 margin: 0;
                 padding: 20px;
                 background-color: #f5f5f5;
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1200px;
                 margin: 0 auto;
                 background: white;
                 padding: 30px;
                 border-radius: 10px;
                 box-shadow: 0 0 20px rgba(0,0,0,0.1);
-            }}
-            .header {{
+            }
+            .header {
                 text-align: center;
                 margin-bottom: 30px;
                 padding-bottom: 20px;
                 border-bottom: 2px solid #eaeaea;
-            }}
-            .header h1 {{
+            }
+            .header h1 {
                 color: #2c3e50;
                 margin-bottom: 10px;
-            }}
-            .summary {{
+            }
+            .summary {
                 background: #f8f9fa;
                 padding: 20px;
                 border-radius: 8px;
                 margin-bottom: 30px;
-            }}
-            .url-card {{
+            }
+            .url-card {
                 border: 1px solid #e0e0e0;
                 border-radius: 8px;
                 padding: 20px;
                 margin-bottom: 15px;
                 background: white;
                 transition: transform 0.2s, box-shadow 0.2s;
-            }}
-            .url-card:hover {{
+            }
+            .url-card:hover {
                 transform: translateY(-2px);
                 box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-            }}
-            .url-header {{
+            }
+            .url-header {
                 display: flex;
                 justify-content: space-between;
                 align-items: center;
                 margin-bottom: 10px;
-            }}
-            .url-link {{
+            }
+            .url-link {
                 font-size: 16px;
                 font-weight: bold;
                 color: #1a73e8;
                 text-decoration: none;
                 flex-grow: 1;
-            }}
-            .url-link:hover {{
+            }
+            .url-link:hover {
                 text-decoration: underline;
-            }}
-            .status-badge {{
+            }
+            .status-badge {
                 padding: 4px 12px;
                 border-radius: 20px;
                 font-size: 12px;
                 font-weight: bold;
-            }}
-            .status-200 {{ background: #d4edda; color: #155724; }}
-            .status-404 {{ background: #f8d7da; color: #721c24; }}
-            .status-error {{ background: #fff3cd; color: #856404; }}
-            .status-other {{ background: #cce7ff; color: #004085; }}
-            .title {{
+            }
+            .status-200 { background: #d4edda; color: #155724; }
+            .status-404 { background: #f8d7da; color: #721c24; }
+            .status-error { background: #fff3cd; color: #856404; }
+            .status-other { background: #cce7ff; color: #004085; }
+            .title {
                 font-weight: 600;
                 color: #2c3e50;
                 margin: 10px 0 5px 0;
-            }}
-            .description {{
+            }
+            .description {
                 color: #666;
                 font-size: 14px;
                 line-height: 1.4;
-            }}
-            .stats {{
+            }
+            .stats {
                 display: grid;
                 grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
                 gap: 15px;
                 margin-bottom: 30px;
-            }}
-            .stat-card {{
+            }
+            .stat-card {
                 background: white;
                 padding: 20px;
                 border-radius: 8px;
                 text-align: center;
                 box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-            }}
-            .stat-number {{
+            }
+            .stat-number {
                 font-size: 2em;
                 font-weight: bold;
                 margin-bottom: 5px;
-            }}
-            .stat-200 {{ color: #28a745; }}
-            .stat-404 {{ color: #dc3545; }}
-            .stat-error {{ color: #ffc107; }}
-            .stat-label {{
+            }
+            .stat-200 { color: #28a745; }
+            .stat-404 { color: #dc3545; }
+            .stat-error { color: #ffc107; }
+            .stat-label {
                 font-size: 0.9em;
                 color: #666;
-            }}
-            .footer {{
+            }
+            .footer {
                 text-align: center;
                 margin-top: 40px;
                 padding-top: 20px;
                 border-top: 1px solid #eaeaea;
                 color: #666;
                 font-size: 0.9em;
-            }}
-        </style>
+            }
+"""
+
+_STATUS_CLASS = {200: "status-200", 404: "status-404", "Error": "status-error"}
+
+def generate_html_report(urls_data):
+    """Generate a beautiful HTML report with URL information, as UTF-8 bytes."""
+    working_count = broken_count = error_count = 0
+    for url_info in urls_data:
+        status_code = url_info.get('status_code')
+        if status_code == 200:
+            working_count += 1
+        elif status_code == 404:
+            broken_count += 1
+        elif status_code == 'Error':
+            error_count += 1
+    
+    header_html = f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>URL Extraction Report</title>
+        <style>{_REPORT_STYLE}        </style>
     </head>
     <body>
         <div class="container">
@@ -225,15 +328,15 @@ def generate_html_report(urls_data, filename):
                         <div class="stat-label">Total URLs</div>
                     </div>
                     <div class="stat-card">
-                        <div class="stat-number stat-200">{len([u for u in urls_data if u.get('status_code') == 200])}</div>
+                        <div class="stat-number stat-200">{working_count}</div>
                         <div class="stat-label">Working URLs (200)</div>
                     </div>
                     <div class="stat-card">
-                        <div class="stat-number stat-404">{len([u for u in urls_data if u.get('status_code') == 404])}</div>
+                        <div class="stat-number stat-404">{broken_count}</div>
                         <div class="stat-label">Broken URLs (404)</div>
                     </div>
                     <div class="stat-card">
-                        <div class="stat-number stat-error">{len([u for u in urls_data if u.get('status_code') == 'Error'])}</div>
+                        <div class="stat-number stat-error">{error_count}</div>
                         <div class="stat-label">Error URLs</div>
                     </div>
                 </div>
@@ -241,69 +344,106 @@ def generate_html_report(urls_data, filename):
             
             <h2>🔗 Extracted URLs</h2>
     """
+    parts = [header_html]
     
     for url_info in urls_data:
-        status_class = f"status-{url_info['status_code']}" if url_info['status_code'] != 'Error' else "status-error"
-        if url_info['status_code'] not in [200, 404, 'Error']:
-            status_class = "status-other"
+        status_code = url_info['status_code']
+        status_class = _STATUS_CLASS.get(status_code, "status-other")
+        status_label = f"Status: {status_code}" if status_code != 'Error' else 'Error'
         
-        html_content += f"""
+        parts.append(f"""
             <div class="url-card">
                 <div class="url-header">
                     <a href="{url_info['url']}" class="url-link" target="_blank">{url_info['url']}</a>
                     <span class="status-badge {status_class}">
-                        {f"Status: {url_info['status_code']}" if url_info['status_code'] != 'Error' else 'Error'}
+                        {status_label}
                     </span>
                 </div>
                 <div class="title">📝 Title: {url_info['title']}</div>
                 <div class="description">📋 Description: {url_info['meta_description']}</div>
             </div>
-        """
+        """)
     
-    html_content += """
+    parts.append("""
             <div class="footer">
                 <p>Generated by URL Extractor Pro • Powered by Streamlit</p>
             </div>
         </div>
     </body>
     </html>
+    """)
+    return ''.join(parts).encode('utf-8')
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_process_data(raw_input):
+    """Streamlit-cached process_data; each rerun gets its own copy of the results."""
+    return process_data(raw_input)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_url_details(urls, parallel):
+    """Fetch get_url_info for every URL, showing progress as requests finish.
+
+    Cached for an hour per URL tuple; on a hit Streamlit replays the
+    finished progress elements instead of going back to the network.
     """
+    st.info("🌐 Fetching URL details (this may take a while for many URLs)...")
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    progress_bar = st.progress(0)
+    status_text = st.empty()
     
-    return filename
-
-def process_data(raw_input):
-    """Main processing logic that handles structured and unstructured input."""
-
-    # Try to parse the input as JSON
-    parsed_data = safe_parse_json(raw_input)
+    total = len(urls)
+    url_details = [None] * total
+    # Each widget update is a round trip to the browser; refresh ~PROGRESS_UPDATES times
+    step = max(1, total // PROGRESS_UPDATES)
+    # A pool per call, so one session's fetch never queues behind another's
+    executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS if parallel else 1)
+    futures = {executor.submit(get_url_info, url): i for i, url in enumerate(urls)}
+    try:
+        # Report progress as requests finish, but keep the input order
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            url_details[i] = future.result()
+            if done % step == 0 or done == total:
+                status_text.text(f"Processed URL {done}/{total}: {urls[i][:50]}...")
+                progress_bar.progress(done / total)
+    finally:
+        # Streamlit interrupts the script on any widget change; drop queued work
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    
+    status_text.text("✅ URL details fetched successfully!")
+    return url_details
 
-    # If parsing failed, treat the input as plain text
-    if parsed_data is None:
-        parsed_data = raw_input
+# Export payloads are built once per distinct input rather than on every rerun
 
-    # Extract all URLs
-    all_urls_raw = extract_urls(parsed_data)
-    all_urls = set(normalize_url(url) for url in all_urls_raw)
+@st.cache_data(show_spinner=False)
+def results_to_json(results):
+    """Serialize extraction results for the JSON download."""
+    return dump_json(results)
 
-    # Try to extract stream URLs only if input was structured
-    stream_urls = []
-    if isinstance(parsed_data, dict) and "streams" in parsed_data:
-        stream_urls = [normalize_url(item.get("stream")) for item in parsed_data.get("streams", []) if item.get("stream")]
+@st.cache_data(show_spinner=False)
+def urls_to_csv(urls):
+    """Render a one-column CSV of URLs for the CSV download."""
+    # Typical URLs need no CSV quoting, so skip the writer unless one does
+    if not any(',' in url or '"' in url or '\n' in url or '\r' in url for url in urls):
+        return "URLs\n" + "".join(url + "\n" for url in urls)
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["URLs"])
+    writer.writerows([url] for url in urls)
+    return buffer.getvalue()
 
-    unique_stream_urls = set(stream_urls)
-    unique_domains = set(extract_domain(url) for url in all_urls)
+@st.cache_data(show_spinner=False)
+def url_details_frame(url_details):
+    """Tabulate fetched URL details with Arrow-backed text columns.
 
-    return {
-        "total_urls_found": len(all_urls),
-        "unique_urls": list(all_urls),
-        "total_stream_urls": len(unique_stream_urls),
-        "unique_stream_urls": list(unique_stream_urls),
-        "total_unique_domains": len(unique_domains),
-        "unique_domains": list(unique_domains)
-    }
+    status_code mixes HTTP codes with the 'Error' marker, so it has no
+    single Arrow type and stays an object column.
+    """
+    details_df = pd.DataFrame.from_records(url_details, columns=DETAILS_COLUMNS)
+    return details_df.astype({column: "string[pyarrow]" for column in ("url", "title", "meta_description")})
 
 def main():
     # Configure the page
@@ -389,7 +529,7 @@ def main():
             fetch_details = st.checkbox("Fetch URL details", value=True, 
                                        help="Extract page titles, meta descriptions, and check URL status")
         with col2:
-            parallel_processing = st.checkbox("Parallel processing", value=False,
+            parallel_processing = st.checkbox("Parallel processing", value=True,
                                             help="Process multiple URLs simultaneously (faster but more resource intensive)")
     
     # Process button
@@ -401,11 +541,18 @@ def main():
         if not input_text.strip():
             st.error("❌ Please enter some data to process.")
             return
-            
+        
+        # Remember what was processed so the results survive the reruns
+        # triggered by the fetch and download buttons below
+        st.session_state.processed_input = input_text
+        st.session_state.pop("url_details", None)
+        st.session_state.pop("html_report", None)
+    
+    if "processed_input" in st.session_state:
         with st.spinner("🔄 Processing your data..."):
             try:
                 # Process the data
-                results = process_data(input_text)
+                results = cached_process_data(st.session_state.processed_input)
                 
                 # Display results in a nice layout
                 st.success("✅ Extraction completed successfully!")
@@ -421,56 +568,51 @@ def main():
                 with col3:
                     st.metric("Unique Domains", results["total_unique_domains"])
                 
-                # Fetch URL details if enabled
+                # URL details are only fetched on request, since they cost a network round trip per URL
                 url_details = []
                 if fetch_details and results["unique_urls"]:
-                    st.info("🌐 Fetching URL details (this may take a while for many URLs)...")
-                    
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    for i, url in enumerate(results["unique_urls"]):
-                        status_text.text(f"Processing URL {i+1}/{len(results['unique_urls'])}: {url[:50]}...")
-                        url_info = get_url_info(url)
-                        url_details.append(url_info)
-                        progress_bar.progress((i + 1) / len(results["unique_urls"]))
-                    
-                    status_text.text("✅ URL details fetched successfully!")
-                    
-                    # Display URL details in a dataframe
-                    st.subheader("📄 URL Details")
-                    if url_details:
-                        details_df = pd.DataFrame(url_details)
-                        st.dataframe(details_df, use_container_width=True)
-                        
-                        # Status summary
-                        st.subheader("📈 Status Summary")
-                        status_counts = details_df['status_code'].value_counts()
-                        cols = st.columns(len(status_counts))
+                    with st.expander("🔎 URL status details (click to run)"):
+                        if st.button("Fetch now", key="fetch_urls"):
+                            st.session_state.url_details = fetch_url_details(tuple(results["unique_urls"]), parallel_processing)
+                            # Build the report once per fetch rather than on every rerun
+                            st.session_state.html_report = generate_html_report(st.session_state.url_details)
+                        url_details = st.session_state.get("url_details", [])
                         
-                        for idx, (status, count) in enumerate(status_counts.items()):
-                            with cols[idx % len(cols)]:
-                                if status == 200:
-                                    st.metric("Working URLs", count, delta=f"{count/len(url_details)*100:.1f}%")
-                                elif status == 404:
-                                    st.metric("Broken URLs", count, delta=f"{count/len(url_details)*100:.1f}%", delta_color="inverse")
-                                else:
-                                    st.metric(f"Status {status}", count)
+                        # Display URL details in a dataframe
+                        if url_details:
+                            st.subheader("📄 URL Details")
+                            details_df = url_details_frame(url_details)
+                            st.dataframe(details_df, use_container_width=True)
+                            
+                            # Status summary
+                            st.subheader("📈 Status Summary")
+                            status_counts = details_df['status_code'].value_counts()
+                            statuses = status_counts.index.to_numpy()
+                            counts = status_counts.to_numpy()
+                            percents = counts * 100.0 / len(url_details)
+                            cols = st.columns(len(counts))
+                            
+                            for idx, (status, count, percent) in enumerate(zip(statuses, counts.tolist(), percents)):
+                                with cols[idx % len(cols)]:
+                                    if status == 200:
+                                        st.metric("Working URLs", count, delta=f"{percent:.1f}%")
+                                    elif status == 404:
+                                        st.metric("Broken URLs", count, delta=f"{percent:.1f}%", delta_color="inverse")
+                                    else:
+                                        st.metric(f"Status {status}", count)
                 
                 # Unique Domains section
                 st.subheader("🌐 Unique Domains")
                 if results["unique_domains"]:
-                    domains_df = pd.DataFrame({
-                        'Domain': results["unique_domains"]
-                    })
-                    st.dataframe(domains_df, use_container_width=True, hide_index=True)
+                    st.dataframe({'Domain': results["unique_domains"]}, use_container_width=True, hide_index=True)
                     
                     # Display as badges
                     st.write("**Quick View:**")
-                    cols = st.columns(4)
-                    for i, domain in enumerate(results["unique_domains"]):
-                        with cols[i % 4]:
-                            st.markdown(f"🔹 `{domain}`")
+                    badges = "".join(f"<div>🔹 <code>{html.escape(domain)}</code></div>" for domain in results["unique_domains"])
+                    st.markdown(
+                        f'<div style="display:grid;grid-template-columns:repeat(4,1fr);gap:6px">{badges}</div>',
+                        unsafe_allow_html=True
+                    )
                 else:
                     st.info("No domains found in the input data.")
                 
@@ -483,47 +625,47 @@ def main():
                     st.dataframe(urls_df, use_container_width=True, hide_index=True)
                     
                     # Show count by type
-                    http_urls = [url for url in results["unique_urls"] if url.startswith('http://')]
-                    https_urls = [url for url in results["unique_urls"] if url.startswith('https://')]
-                    
                     col1, col2 = st.columns(2)
                     with col1:
-                        st.metric("HTTPS URLs", len(https_urls))
+                        st.metric("HTTPS URLs", results["total_https_urls"])
                     with col2:
-                        st.metric("HTTP URLs", len(http_urls))
+                        st.metric("HTTP URLs", results["total_http_urls"])
                 else:
                     st.info("No URLs found in the input data.")
                 
                 # Stream URLs section
                 st.subheader("🎥 Stream URLs")
-                if results["unique_stream_urls"]:
+                # Order-preserving dedup guard, so the domain mapping below never repeats work
+                stream_urls = list(dict.fromkeys(results["unique_stream_urls"]))
+                if stream_urls:
                     streams_df = pd.DataFrame({
-                        'Stream URL': results["unique_stream_urls"]
+                        'Stream URL': stream_urls
                     })
                     st.dataframe(streams_df, use_container_width=True, hide_index=True)
                     
                     # Stream URL analysis
-                    stream_domains = [extract_domain(url) for url in results["unique_stream_urls"]]
-                    domain_count = pd.Series(stream_domains).value_counts()
+                    domain_count = streams_df['Stream URL'].map(extract_domain).value_counts()
                     
-                    st.write("**Stream URLs by Domain:**")
-                    for domain, count in domain_count.items():
-                        st.write(f"- `{domain}`: {count} URLs")
+                    # One markdown element for the whole breakdown instead of one per domain
+                    st.markdown("**Stream URLs by Domain:**\n" + "\n".join(
+                        f"- `{domain}`: {count} URLs" for domain, count in domain_count.items()
+                    ))
                 else:
                     st.info("No stream URLs found. Make sure your JSON has a 'streams' array.")
                 
                 # Export section
                 st.subheader("📤 Export Results")
                 
+                # One timestamp so all three downloads share a filename suffix
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 col1, col2, col3 = st.columns(3)
                 
                 # JSON export
                 with col1:
-                    json_data = json.dumps(results, indent=2)
                     st.download_button(
                         label="📥 Download as JSON",
-                        data=json_data,
-                        file_name=f"url_extraction_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        data=results_to_json(results),
+                        file_name=f"url_extraction_{timestamp}.json",
                         mime="application/json",
                         use_container_width=True
                     )
@@ -531,11 +673,10 @@ def main():
                 # CSV export for URLs
                 with col2:
                     if results["unique_urls"]:
-                        csv_data = pd.DataFrame({'URLs': results["unique_urls"]}).to_csv(index=False)
                         st.download_button(
                             label="📥 Download URLs as CSV",
-                            data=csv_data,
-                            file_name=f"urls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                            data=urls_to_csv(tuple(results["unique_urls"])),
+                            file_name=f"urls_{timestamp}.csv",
                             mime="text/csv",
                             use_container_width=True
                         )
@@ -543,30 +684,18 @@ def main():
                 # HTML Report export
                 with col3:
                     if url_details:
-                        html_filename = f"url_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-                        generate_html_report(url_details, html_filename)
-                        
-                        with open(html_filename, 'rb') as f:
-                            html_data = f.read()
-                        
                         st.download_button(
                             label="📊 Download HTML Report",
-                            data=html_data,
-                            file_name=html_filename,
+                            data=st.session_state.html_report,
+                            file_name=f"url_report_{timestamp}.html",
                             mime="text/html",
                             use_container_width=True
                         )
-                        
-                        # Clean up temporary file
-                        try:
-                            os.remove(html_filename)
-                        except:
-                            pass
                     else:
                         st.button(
                             "📊 Download HTML Report",
                             disabled=True,
-                            help="Enable 'Fetch URL details' to generate HTML report",
+                            help="Fetch URL details to generate HTML report",
                             use_container_width=True
                         )
                 
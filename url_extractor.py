@@ -0,0 +1,163 @@
+import functools
+import json
+import re
+from urllib.parse import urlparse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# One branch instead of an alternation, so each candidate start is tried once
+_URL_RE = re.compile(r'(?:https?:)?//[^\s"\'<>]+')
+_STREAM_RE = re.compile(r'"stream"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
+
+def _iter_strings(root):
+    """Yield every string in a nested dictionary/list structure, in document order.
+
+    Walks the structure with an explicit stack so deeply nested input
+    cannot hit the recursion limit.
+    """
+    stack = [root]
+    # Builtins as locals: the type dispatch below runs once per node
+    _dict, _list, _str = dict, list, str
+
+    while stack:
+        obj = stack.pop()
+        t = type(obj)
+        if t is _dict:
+            stack.extend(reversed(obj.values()))
+        elif t is _list:
+            stack.extend(reversed(obj))
+        elif t is _str:
+            yield obj
+
+def extract_urls(root):
+    """Extract all URLs from a nested dictionary, list, or string, in document order."""
+    urls = []
+    findall = _URL_RE.findall
+    for text in _iter_strings(root):
+        urls.extend(findall(text))
+    return urls
+
+def _extract_all(root):
+    """Collect normalized unique URLs, their domains and the HTTPS count in a single pass."""
+    urls = set()
+    domains = set()
+    https_count = 0
+    findall = _URL_RE.findall
+
+    for text in _iter_strings(root):
+        for match in findall(text):
+            url = 'https:' + match if match[0] == '/' else match
+            if url not in urls:
+                urls.add(url)
+                domains.add(_netloc(url))
+                # Every url starts with http:// or https://
+                if url[4] == 's':
+                    https_count += 1
+
+    return urls, domains, https_count
+
+def normalize_url(url):
+    """Ensure the URL has a proper scheme."""
+    if url.startswith("//"):
+        return "https:" + url
+    return url
+
+def _netloc(url):
+    """Slice the netloc out of an http(s):// or // URL; None for anything else."""
+    if url.startswith('https://'):
+        start = 8
+    elif url.startswith('http://'):
+        start = 7
+    elif url.startswith('//'):
+        start = 2
+    else:
+        return None
+
+    end = len(url)
+    for ch in '/?#':
+        i = url.find(ch, start, end)
+        if i != -1:
+            end = i
+    return url[start:end]
+
+@functools.lru_cache(maxsize=4096)
+def extract_domain(url):
+    """Extract domain from a URL; memoized, as the same URLs recur across reruns."""
+    netloc = _netloc(url)
+    if netloc is None:
+        # Unusual scheme or casing; let urlparse handle it
+        netloc = urlparse(url).netloc
+    return netloc
+
+def _looks_like_json(raw_input):
+    """Cheap check for input that could be a JSON object or array."""
+    stripped = raw_input.lstrip()
+    return bool(stripped) and stripped[0] in '{['
+
+def safe_parse_json(raw_input):
+    """Try to parse raw input into JSON; fallback to None if fails."""
+    # Plain text never reaches the decoder and its exception path
+    if not _looks_like_json(raw_input):
+        return None
+    try:
+        return _json_loads(raw_input)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
+        return None
+
+def dump_json(obj):
+    """Serialize obj as indented JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def _unescape_json_string(value):
+    """Decode the escapes of a raw JSON string body; None if they are invalid."""
+    try:
+        return json.loads('"' + value + '"')
+    except json.JSONDecodeError:
+        return None
+
+@functools.lru_cache(maxsize=32)
+def process_data(raw_input):
+    """Main processing logic that handles structured and unstructured input.
+
+    Results are memoized per input string, so callers must treat the
+    returned dict as read-only.
+    """
+
+    looks_json = _looks_like_json(raw_input)
+
+    # JSON escapes such as "\/" only resolve after decoding. Without them,
+    # scanning the raw text finds the same URLs as walking the decoded values.
+    parsed_data = None
+    if looks_json and '\\' in raw_input:
+        parsed_data = safe_parse_json(raw_input)
+
+    # Extract all URLs and their domains
+    all_urls, unique_domains, https_count = _extract_all(raw_input if parsed_data is None else parsed_data)
+
+    # Pull stream URLs straight out of the text instead of the decoded tree
+    unique_stream_urls = set()
+    if looks_json and '"streams"' in raw_input:
+        for stream in _STREAM_RE.findall(raw_input):
+            if '\\' in stream:
+                stream = _unescape_json_string(stream)
+            if stream:
+                # Inlined normalize_url
+                unique_stream_urls.add('https:' + stream if stream.startswith('//') else stream)
+
+    return {
+        "total_urls_found": len(all_urls),
+        "unique_urls": list(all_urls),
+        "total_https_urls": https_count,
+        "total_http_urls": len(all_urls) - https_count,
+        "total_stream_urls": len(unique_stream_urls),
+        "unique_stream_urls": list(unique_stream_urls),
+        "total_unique_domains": len(unique_domains),
+        "unique_domains": list(unique_domains)
+    }